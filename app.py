@@ -1,151 +1,404 @@
-from flask import Flask, render_template, request, jsonify
+# Patch the standard library for gevent before anything else imports it;
+# psycopg sees the patched select module and waits on its sockets through
+# gevent, so a query yields to other requests
+from gevent import monkey
+monkey.patch_all()
+
+from flask import Flask, Response, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from typing import Annotated, List
+import orjson
+from cachetools import TTLCache
+from werkzeug.exceptions import RequestEntityTooLarge
+from pydantic import BaseModel, StringConstraints, TypeAdapter, ValidationError
+import psycopg
+import psycopg.errors
+from psycopg_pool import ConnectionPool
+from contextlib import contextmanager
+import logging
 import os
+import threading
+
+from config import (
+    BUMP_VERSION_SQL, DB_NAME, MAX_CONTENT_LENGTH, MAX_TITLE_LENGTH, SCHEMA_STATEMENTS, SERVER_CONFIG,
+    WORKER_COUNT
+)
+
+logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler()])
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        # orjson handles datetime natively; anything else falls back to Flask
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+class EntryIn(BaseModel):
+    """Title and content submitted for a journal entry"""
+    title: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=MAX_TITLE_LENGTH)]
+    content: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=MAX_CONTENT_LENGTH)]
+
+ENTRY_LIST = TypeAdapter(List[EntryIn])
+
+def validation_error(e):
+    """Build the 400 response for a failed EntryIn validation"""
+    error = e.errors()[0]
+    if error['type'] == 'string_too_long':
+        message = f"{str(error['loc'][-1]).capitalize()} is too long"
+    else:
+        message = 'Title and content are required'
+    return jsonify({'success': False, 'error': message}), 400
+
+def read_json_body(max_bytes):
+    """Parse the request's JSON body, or return None if it is missing or malformed
+    
+    Bodies declared larger than max_bytes are refused with a 413 before
+    any of them is read. Bodies sent without a length are still bounded
+    by the app-wide MAX_CONTENT_LENGTH.
+    """
+    if request.content_length is not None and request.content_length > max_bytes:
+        raise RequestEntityTooLarge()
+    return request.get_json(silent=True)
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Reject an oversized request body with the API's JSON error shape"""
+    return jsonify({'success': False, 'error': 'Request body is too large'}), 413
+
+# Connect through a local PgBouncer in transaction pooling mode by default;
+# set DB_PGBOUNCER=false to connect to the database server directly
+USE_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'true').lower() == 'true'
 
-# Database configuration for YugabyteDB
 DB_CONFIG = {
-    'host': 'localhost',
-    'port': int(os.getenv('DB_PORT', '5433')),  # YugabyteDB default YSQL port is 5433
-    'database': 'journal_db',
-    'user': os.getenv('DB_USER', 'yugabyte'),
-    'password': os.getenv('DB_PASSWORD', 'yugabyte')
+    **SERVER_CONFIG,
+    # PgBouncer listens on its own port; DB_PORT is the database server's
+    'port': int(os.getenv('PGBOUNCER_PORT', '6432')) if USE_PGBOUNCER else SERVER_CONFIG['port'],
+    'dbname': DB_NAME,
+    # psycopg prepares statements on the server the first time they run,
+    # so later executions skip parsing and planning. PgBouncer's
+    # transaction pooling hands each transaction whichever backend is
+    # free, so statements are never prepared behind it.
+    'prepare_threshold': None if USE_PGBOUNCER else 0,
 }
 
+# Connections per worker process. Connecting directly, the "2 * cores +
+# spindles" rule of thumb (database throughput peaks around there and drops
+# off with more connections) is split across all gunicorn workers. Behind
+# PgBouncer each worker only needs a handful of client connections, since
+# PgBouncer itself caps the number of backend connections.
+DB_POOL_MAX = int(os.getenv(
+    'DB_POOL_MAX', 4 if USE_PGBOUNCER else max((2 * (os.cpu_count() or 1) + 2) // WORKER_COUNT, 1)
+))
+
+# Largest number of entries accepted by a single bulk create request
+MAX_BULK_ENTRIES = 1000
+
+# Largest request bodies accepted, in bytes. One entry at the length limits
+# fits in about 4 MB even if every character takes 4 bytes of UTF-8. A bulk
+# request shares a fixed budget, so it cannot carry MAX_BULK_ENTRIES
+# entries of maximum length.
+MAX_ENTRY_BODY_BYTES = 4 * (MAX_TITLE_LENGTH + MAX_CONTENT_LENGTH) + 1024
+MAX_BULK_BODY_BYTES = 16 * 1024 * 1024
+# Werkzeug refuses larger bodies before they are read or parsed
+app.config['MAX_CONTENT_LENGTH'] = MAX_BULK_BODY_BYTES
+
+# Page size for GET /api/entries when no limit is given, and its upper bound
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# RETURNING clause for statements that send an entry back to the client.
+# The database converts timestamps to epoch milliseconds, so they never
+# become Python datetime objects.
+ENTRY_RETURNING = """
+    RETURNING id, title, content,
+              (extract(epoch from created_at::timestamptz) * 1000)::bigint,
+              (extract(epoch from updated_at::timestamptz) * 1000)::bigint
+"""
+
+# Serialized GET /api/entries bodies keyed by the entries' ETag and page.
+# Every write bumps journal_version in its own transaction, so a cached page
+# is only served while its version is current; the TTL only evicts pages
+# for versions that have since been replaced.
+ENTRIES_CACHE_TTL = float(os.getenv('ENTRIES_CACHE_TTL', '60'))
+_entries_cache = TTLCache(maxsize=256, ttl=ENTRIES_CACHE_TTL)
+_entries_cache_lock = threading.Lock()
+
+# Seconds a request waits for a free connection before failing. The pool
+# also waits this long while the database is unreachable, so keep it short.
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+
+# Shared pool of open connections, created once per worker on first use.
+# Requests beyond the pool size wait in the pool's queue for a free
+# connection. The pool connects in the background and keeps retrying
+# while the database is down, so creating it never blocks.
+connection_pool = None
+_pool_lock = threading.Lock()
+
+def init_connection_pool():
+    """Create the shared connection pool if it doesn't exist yet"""
+    global connection_pool
+    with _pool_lock:
+        if connection_pool is None:
+            connection_pool = ConnectionPool(
+                min_size=DB_POOL_MAX, max_size=DB_POOL_MAX, kwargs=DB_CONFIG,
+                timeout=DB_POOL_TIMEOUT, open=True
+            )
+    return connection_pool
+
+@contextmanager
 def get_db_connection():
-    """Create and return a database connection"""
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    except psycopg2.Error as e:
-        print(f"Error connecting to database: {e}")
-        raise
+    """Borrow a connection from the pool and hand it back when done"""
+    # The pool ends any open transaction before the connection is reused
+    with init_connection_pool().connection() as conn:
+        yield conn
+
+def entry_from_row(row):
+    """Build the API representation of a row returned through ENTRY_RETURNING"""
+    entry_id, title, content, created_at_ms, updated_at_ms = row
+    return {
+        'id': entry_id,
+        'title': title,
+        'content': content,
+        'created_at_ms': created_at_ms,
+        'updated_at_ms': updated_at_ms,
+    }
 
 def init_db():
     """Initialize the database schema"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # Create journal_entries table if it doesn't exist
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS journal_entries (
-            id SERIAL PRIMARY KEY,
-            title VARCHAR(255) NOT NULL,
-            content TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("Database initialized successfully")
+    # Use a dedicated connection: this runs in the gunicorn master, and a
+    # pool created there would be shared by every forked worker
+    with psycopg.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cur:
+            # DDL takes catalog locks across the cluster even when there is
+            # nothing to create, so check the catalog with a plain read first
+            cur.execute("""
+                SELECT to_regclass('journal_entries') IS NOT NULL
+                   AND to_regclass('idx_journal_entries_created_at') IS NOT NULL
+                   AND to_regclass('journal_version') IS NOT NULL
+            """)
+            if cur.fetchone()[0]:
+                logger.info("Database schema already initialized")
+                return
+            
+            # Serialize app instances starting at the same time; the lock is
+            # released when the transaction commits
+            try:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext('journal_init'))")
+            except psycopg.errors.FeatureNotSupported:
+                # Older YugabyteDB releases lack advisory locks; the
+                # IF NOT EXISTS clauses still make concurrent runs safe
+                conn.rollback()
+            
+            for statement in SCHEMA_STATEMENTS:
+                cur.execute(statement)
+        conn.commit()
+    logger.info("Database initialized successfully")
 
 @app.route('/')
 def index():
     """Render the main page"""
     return render_template('index.html')
 
+def fetch_entries_etag():
+    """Read the ETag of the entry list, which changes with every write to it"""
+    # One primary-key lookup on a single-row table, however many entries exist
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT version FROM journal_version WHERE id = 1")
+            return str(cur.fetchone()[0])
+
+def fetch_entries_page(limit, before, before_id):
+    """Query a page of entries and return the GET /api/entries JSON body
+    together with the ETag of the version it was read from"""
+    if before is None:
+        where = ''
+    elif before_id is None:
+        where = 'WHERE created_at < %(before)s'
+    else:
+        # Entries created in the same transaction share created_at, so
+        # the id breaks ties between them
+        where = 'WHERE (created_at, id) < (%(before)s, %(before_id)s)'
+    
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # Let the database build the JSON array so rows never become
+            # Python objects; cast to text to skip psycopg's json parsing.
+            # Timestamps go out as epoch milliseconds for the browser to
+            # format. A full page means there may be more, so return a
+            # cursor pointing at its last (oldest) entry, keeping the full
+            # microsecond precision of created_at. The version is read in the
+            # same statement, so it matches the page exactly.
+            cur.execute("""
+                SELECT COALESCE(json_agg(json_build_object(
+                           'id', t.id,
+                           'title', t.title,
+                           'content', t.content,
+                           'created_at_ms', (extract(epoch from t.created_at::timestamptz) * 1000)::bigint,
+                           'updated_at_ms', (extract(epoch from t.updated_at::timestamptz) * 1000)::bigint
+                       ) ORDER BY t.created_at DESC, t.id DESC), '[]')::text,
+                       CASE WHEN count(*) = %(limit)s THEN
+                           (array_agg(json_build_object(
+                                'before', to_char(t.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                                'before_id', t.id
+                            ) ORDER BY t.created_at, t.id))[1]::text
+                       END,
+                       (SELECT version FROM journal_version WHERE id = 1)
+                FROM (
+                    SELECT id, title, content, created_at, updated_at
+                    FROM journal_entries
+                    """ + where + """
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %(limit)s
+                ) t
+            """, {'limit': limit, 'before': before, 'before_id': before_id})
+
+            entries_json, next_cursor, version = cur.fetchone()
+
+    body = f'{{"success": true, "entries": {entries_json}, "next_cursor": {next_cursor or "null"}}}'
+    return body, str(version)
+
 @app.route('/api/entries', methods=['GET'])
 def get_entries():
-    """Get all journal entries, ordered by most recent first"""
+    """Get a page of journal entries, ordered by most recent first
+    
+    Pages are selected with keyset pagination: pass the ``next_cursor``
+    values from the previous response as the ``before`` and ``before_id``
+    query parameters to fetch the following page.
+    """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            before = request.args.get('before')
+            before = datetime.fromisoformat(before) if before else None
+            before_id = request.args.get('before_id', type=int)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid pagination parameters'}), 400
         
-        cur.execute("""
-            SELECT id, title, content, 
-                   created_at, updated_at
-            FROM journal_entries
-            ORDER BY created_at DESC
-        """)
+        etag = fetch_entries_etag()
         
-        entries = cur.fetchall()
+        # The browser already has this version of the entries
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            key = (etag, limit, before, before_id)
+            with _entries_cache_lock:
+                body = _entries_cache.get(key)
+            
+            if body is None:
+                # A write may have landed since the ETag was read; label the
+                # page with the version it actually shows
+                body, etag = fetch_entries_page(limit, before, before_id)
+                with _entries_cache_lock:
+                    _entries_cache[(etag, limit, before, before_id)] = body
+            
+            response = Response(body, mimetype='application/json')
         
-        # Convert datetime objects to strings
-        for entry in entries:
-            entry['created_at'] = entry['created_at'].isoformat()
-            entry['updated_at'] = entry['updated_at'].isoformat()
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify({'success': True, 'entries': entries})
+        response.set_etag(etag)
+        # Let the browser keep the body, but have it revalidate every time
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/entries', methods=['POST'])
 def create_entry():
     """Create a new journal entry"""
+    data = read_json_body(MAX_ENTRY_BODY_BYTES)
     try:
-        data = request.get_json()
-        title = data.get('title', '').strip()
-        content = data.get('content', '').strip()
+        try:
+            entry_in = EntryIn.model_validate(data)
+        except ValidationError as e:
+            return validation_error(e)
         
-        if not title or not content:
-            return jsonify({'success': False, 'error': 'Title and content are required'}), 400
+        with get_db_connection() as conn:
+            with conn.cursor(binary=True) as cur:
+                cur.execute(BUMP_VERSION_SQL)
+                cur.execute("""
+                    INSERT INTO journal_entries (title, content, created_at, updated_at)
+                    VALUES (%s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                """ + ENTRY_RETURNING, (entry_in.title, entry_in.content))
+                
+                row = cur.fetchone()
+            conn.commit()
         
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        return jsonify({'success': True, 'entry': entry_from_row(row)}), 201
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/entries/bulk', methods=['POST'])
+def create_entries_bulk():
+    """Create many journal entries in a single round-trip"""
+    data = read_json_body(MAX_BULK_BODY_BYTES)
+    try:
+        if not isinstance(data, list) or not data:
+            return jsonify({'success': False, 'error': 'Expected a non-empty list of entries'}), 400
         
-        cur.execute("""
-            INSERT INTO journal_entries (title, content, created_at, updated_at)
-            VALUES (%s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            RETURNING id, title, content, created_at, updated_at
-        """, (title, content))
+        if len(data) > MAX_BULK_ENTRIES:
+            return jsonify({'success': False, 'error': f'At most {MAX_BULK_ENTRIES} entries per request'}), 400
         
-        entry = cur.fetchone()
-        entry['created_at'] = entry['created_at'].isoformat()
-        entry['updated_at'] = entry['updated_at'].isoformat()
+        try:
+            rows = [(e.title, e.content) for e in ENTRY_LIST.validate_python(data)]
+        except ValidationError as e:
+            return validation_error(e)
         
-        conn.commit()
-        cur.close()
-        conn.close()
+        with get_db_connection() as conn:
+            with conn.cursor(binary=True) as cur:
+                cur.execute(BUMP_VERSION_SQL)
+                # executemany pipelines the inserts: every statement is sent
+                # before waiting for the first result
+                cur.executemany("""
+                    INSERT INTO journal_entries (title, content)
+                    VALUES (%s, %s)
+                """ + ENTRY_RETURNING, rows, returning=True)
+                
+                inserted = []
+                while True:
+                    inserted.append(cur.fetchone())
+                    if not cur.nextset():
+                        break
+            conn.commit()
         
-        return jsonify({'success': True, 'entry': entry}), 201
+        return jsonify({'success': True, 'entries': [entry_from_row(row) for row in inserted]}), 201
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/entries/<int:entry_id>', methods=['PUT'])
 def update_entry(entry_id):
     """Update an existing journal entry"""
+    data = read_json_body(MAX_ENTRY_BODY_BYTES)
     try:
-        data = request.get_json()
-        title = data.get('title', '').strip()
-        content = data.get('content', '').strip()
-        
-        if not title or not content:
-            return jsonify({'success': False, 'error': 'Title and content are required'}), 400
-        
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cur.execute("""
-            UPDATE journal_entries
-            SET title = %s, content = %s, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-            RETURNING id, title, content, created_at, updated_at
-        """, (title, content, entry_id))
+        try:
+            entry_in = EntryIn.model_validate(data)
+        except ValidationError as e:
+            return validation_error(e)
         
-        entry = cur.fetchone()
+        with get_db_connection() as conn:
+            with conn.cursor(binary=True) as cur:
+                cur.execute(BUMP_VERSION_SQL)
+                cur.execute("""
+                    UPDATE journal_entries
+                    SET title = %s, content = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """ + ENTRY_RETURNING, (entry_in.title, entry_in.content, entry_id))
+                
+                row = cur.fetchone()
+            
+            if not row:
+                # Undo the version bump; nothing changed
+                conn.rollback()
+                return jsonify({'success': False, 'error': 'Entry not found'}), 404
+            
+            conn.commit()
         
-        if not entry:
-            cur.close()
-            conn.close()
-            return jsonify({'success': False, 'error': 'Entry not found'}), 404
-        
-        entry['created_at'] = entry['created_at'].isoformat()
-        entry['updated_at'] = entry['updated_at'].isoformat()
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        
-        return jsonify({'success': True, 'entry': entry})
+        return jsonify({'success': True, 'entry': entry_from_row(row)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -153,27 +406,18 @@ def update_entry(entry_id):
 def delete_entry(entry_id):
     """Delete a journal entry"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("DELETE FROM journal_entries WHERE id = %s RETURNING id", (entry_id,))
-        deleted = cur.fetchone()
-        
-        if not deleted:
-            cur.close()
-            conn.close()
-            return jsonify({'success': False, 'error': 'Entry not found'}), 404
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(BUMP_VERSION_SQL)
+                cur.execute("DELETE FROM journal_entries WHERE id = %s RETURNING id", (entry_id,))
+                deleted = cur.fetchone()
+            
+            if not deleted:
+                conn.rollback()
+                return jsonify({'success': False, 'error': 'Entry not found'}), 404
+            
+            conn.commit()
         
         return jsonify({'success': True, 'message': 'Entry deleted successfully'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-
-if __name__ == '__main__':
-    # Initialize database on startup
-    init_db()
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,82 @@
+"""
+Database settings and schema shared by the Personal Journal app and its
+setup script. Set DB_BACKEND=postgres to run against plain PostgreSQL
+instead of YugabyteDB.
+"""
+
+import os
+
+DB_BACKEND = os.getenv('DB_BACKEND', 'yugabyte')
+if DB_BACKEND not in ('yugabyte', 'postgres'):
+    raise ValueError(f"DB_BACKEND must be 'yugabyte' or 'postgres', not {DB_BACKEND!r}")
+
+IS_YUGABYTE = DB_BACKEND == 'yugabyte'
+
+DB_NAME = 'journal_db'
+
+# Number of gunicorn worker processes; each one has its own connection pool
+WORKER_COUNT = int(os.getenv('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+
+# Longest title and content accepted for an entry, by the API and by the
+# JSON Lines import; titles are stored in a VARCHAR(255) column
+MAX_TITLE_LENGTH = 255
+MAX_CONTENT_LENGTH = 1_000_000
+
+# Database that exists on a fresh server, used to create DB_NAME
+ADMIN_DB_NAME = 'yugabyte' if IS_YUGABYTE else 'postgres'
+
+# Superuser that a fresh install of each backend comes with
+DEFAULT_DB_USER = 'yugabyte' if IS_YUGABYTE else 'postgres'
+DEFAULT_DB_PASSWORD = 'yugabyte' if IS_YUGABYTE else 'postgres'
+
+# Connection settings for the database server itself; YugabyteDB default
+# YSQL port is 5433, PostgreSQL's is 5432
+SERVER_CONFIG = {
+    'host': 'localhost',
+    'port': int(os.getenv('DB_PORT', '5433' if IS_YUGABYTE else '5432')),
+    'user': os.getenv('DB_USER', DEFAULT_DB_USER),
+    'password': os.getenv('DB_PASSWORD', DEFAULT_DB_PASSWORD)
+}
+
+# On YugabyteDB, create a colocated database: its tables share a single
+# tablet instead of being split and replicated across many
+CREATE_DATABASE_SQL = f'CREATE DATABASE {DB_NAME}' + (' WITH COLOCATION = true' if IS_YUGABYTE else '')
+
+SCHEMA_STATEMENTS = [
+    # Create journal_entries table if it doesn't exist
+    """
+    CREATE TABLE IF NOT EXISTS journal_entries (
+        id SERIAL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Range index backing the newest-first keyset pagination
+    """
+    CREATE INDEX IF NOT EXISTS idx_journal_entries_created_at
+    ON journal_entries (created_at DESC, id DESC)
+    """,
+    # Single-row counter bumped by every write to journal_entries; the app
+    # serves it as the entry list's ETag
+    """
+    CREATE TABLE IF NOT EXISTS journal_version (
+        id INT PRIMARY KEY CHECK (id = 1),
+        version BIGINT NOT NULL
+    )
+    """,
+    # Start from the creation time so a recreated database never reissues
+    # ETags a client may still hold from the old one
+    """
+    INSERT INTO journal_version (id, version)
+    VALUES (1, (extract(epoch from clock_timestamp()) * 1000000)::bigint)
+    ON CONFLICT (id) DO NOTHING
+    """,
+]
+
+# Run as the first statement of every transaction that changes
+# journal_entries. The row lock it takes queues concurrent writers behind
+# each other; a conflict on a transaction's first statement is one that
+# YugabyteDB retries by itself instead of failing the transaction.
+BUMP_VERSION_SQL = "UPDATE journal_version SET version = version + 1 WHERE id = 1"
@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for the Personal Journal app.
+Gunicorn loads this file automatically when started from this directory:
+
+    gunicorn app:app
+"""
+
+import os
+
+from config import WORKER_COUNT
+
+bind = os.getenv('BIND', '0.0.0.0:5001')
+
+# gevent workers handle many in-flight requests each, yielding to one
+# another while they wait on the database
+worker_class = 'gevent'
+workers = WORKER_COUNT
+worker_connections = 1000
+
+def on_starting(server):
+    """Initialize the database schema once, before any workers fork"""
+    from app import init_db
+    init_db()
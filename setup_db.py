@@ -1,82 +1,130 @@
 #!/usr/bin/env python3
 """
 Database setup script for the Personal Journal app.
-This script creates the database and initializes the schema for YugabyteDB.
+This script creates the database and initializes the schema for YugabyteDB
+(or PostgreSQL, with DB_BACKEND=postgres).
+It can also bulk-import entries from a JSON Lines file:
+
+    python setup_db.py --import-jsonl entries.jsonl
 """
 
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-import os
+import psycopg
+import psycopg.errors
+import argparse
+import json
+import logging
 import sys
 
-# Database configuration for YugabyteDB
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': int(os.getenv('DB_PORT', '5433')),  # YugabyteDB default YSQL port is 5433
-    'user': os.getenv('DB_USER', 'yugabyte'),
-    'password': os.getenv('DB_PASSWORD', 'yugabyte')
-}
+from config import (
+    ADMIN_DB_NAME, BUMP_VERSION_SQL, CREATE_DATABASE_SQL, DB_BACKEND, DB_NAME, MAX_CONTENT_LENGTH,
+    MAX_TITLE_LENGTH, SCHEMA_STATEMENTS, SERVER_CONFIG
+)
 
-DB_NAME = 'journal_db'
+logger = logging.getLogger(__name__)
 
 def create_database():
     """Create the journal database if it doesn't exist"""
     try:
-        # Connect to YugabyteDB server (connect to default 'yugabyte' database to create new database)
-        default_db_config = DB_CONFIG.copy()
-        default_db_config['database'] = 'yugabyte'  # Connect to default database first
-        conn = psycopg2.connect(**default_db_config)
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = conn.cursor()
+        # Connect to the server's default database to create the new database,
+        # in autocommit mode since CREATE DATABASE can't run inside a transaction
+        with psycopg.connect(**SERVER_CONFIG, dbname=ADMIN_DB_NAME, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                # Check if database exists, and create it on the same connection if not
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (DB_NAME,))
+                
+                if cur.fetchone():
+                    logger.info("✓ Database '%s' already exists", DB_NAME)
+                else:
+                    try:
+                        cur.execute(CREATE_DATABASE_SQL)
+                        logger.info("✓ Database '%s' created successfully", DB_NAME)
+                    except psycopg.errors.DuplicateDatabase:
+                        # Another setup run created it after our check
+                        logger.info("✓ Database '%s' already exists", DB_NAME)
         
-        # Check if database exists
-        cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (DB_NAME,))
-        exists = cur.fetchone()
+        # Reconnect once, to the journal database, to create tables
+        with psycopg.connect(**SERVER_CONFIG, dbname=DB_NAME) as conn:
+            with conn.cursor() as cur:
+                for statement in SCHEMA_STATEMENTS:
+                    cur.execute(statement)
+            conn.commit()
         
-        if not exists:
-            # Create database
-            cur.execute(f'CREATE DATABASE {DB_NAME}')
-            print(f"✓ Database '{DB_NAME}' created successfully")
-        else:
-            print(f"✓ Database '{DB_NAME}' already exists")
+        logger.info("✓ Schema initialized successfully")
+        logger.info("\nDatabase setup complete! You can now run the Flask app.")
         
-        cur.close()
-        conn.close()
+    except psycopg.OperationalError as e:
+        logger.error("✗ Error connecting to %s: %s", DB_BACKEND, e)
+        logger.error("\nPlease ensure:")
+        logger.error("1. The %s server is running and accessible", DB_BACKEND)
+        logger.error("2. It accepts connections on %s:%s", SERVER_CONFIG['host'], SERVER_CONFIG['port'])
+        logger.error("3. Database credentials are correct")
+        logger.error("4. You can set DB_USER, DB_PASSWORD, and DB_PORT environment variables if needed")
+        sys.exit(1)
+    except Exception as e:
+        logger.error("✗ Error setting up database: %s", e)
+        sys.exit(1)
+
+def read_jsonl_entries(lines):
+    """Yield (title, content) for each {"title": ..., "content": ...} JSON line
+    
+    Entries get the same checks as the API's EntryIn; the first invalid
+    line raises ValueError naming its line number.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
         
-        # Now connect to the new database and create tables
-        conn = psycopg2.connect(**DB_CONFIG, database=DB_NAME)
-        cur = conn.cursor()
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object")
         
-        # Create journal_entries table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS journal_entries (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                content TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        values = []
+        for field, max_length in (('title', MAX_TITLE_LENGTH), ('content', MAX_CONTENT_LENGTH)):
+            value = record.get(field)
+            if value is None:
+                raise ValueError(f"Line {line_number}: {field} is required")
+            if not isinstance(value, str):
+                raise ValueError(f"Line {line_number}: {field} must be a string")
+            value = value.strip()
+            if not value:
+                raise ValueError(f"Line {line_number}: {field} is required")
+            if len(value) > max_length:
+                raise ValueError(f"Line {line_number}: {field} is longer than {max_length} characters")
+            values.append(value)
         
+        yield tuple(values)
+
+def load_from_jsonl(path):
+    """Bulk-import journal entries from a JSON Lines file using COPY"""
+    count = 0
+    with psycopg.connect(**SERVER_CONFIG, dbname=DB_NAME) as conn:
+        # COPY streams every row in one command, far faster than INSERTs
+        with conn.cursor() as cur, open(path, encoding='utf-8') as f:
+            cur.execute(BUMP_VERSION_SQL)
+            with cur.copy("COPY journal_entries (title, content) FROM STDIN") as copy:
+                for row in read_jsonl_entries(f):
+                    copy.write_row(row)
+                    count += 1
         conn.commit()
-        cur.close()
-        conn.close()
-        
-        print(f"✓ Schema initialized successfully")
-        print("\nDatabase setup complete! You can now run the Flask app.")
-        
-    except psycopg2.OperationalError as e:
-        print(f"✗ Error connecting to YugabyteDB: {e}")
-        print("\nPlease ensure:")
-        print("1. YugabyteDB cluster is running and accessible")
-        print("2. YSQL API is enabled on localhost:5433 (default port)")
-        print("3. Database credentials are correct")
-        print("4. You can set DB_USER, DB_PASSWORD, and DB_PORT environment variables if needed")
-        sys.exit(1)
-    except Exception as e:
-        print(f"✗ Error setting up database: {e}")
-        sys.exit(1)
+    
+    logger.info("✓ Imported %d entries from %s", count, path)
 
 if __name__ == '__main__':
-    print("Setting up Personal Journal database on YugabyteDB...")
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[logging.StreamHandler(sys.stdout)])
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--import-jsonl', metavar='PATH',
+                        help='after setup, import entries from a JSON Lines file')
+    args = parser.parse_args()
+    
+    logger.info("Setting up Personal Journal database on %s...", DB_BACKEND)
     create_database()
+    
+    if args.import_jsonl:
+        try:
+            load_from_jsonl(args.import_jsonl)
+        except Exception as e:
+            logger.error("✗ Error importing entries: %s", e)
+            sys.exit(1)
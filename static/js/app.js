@@ -1,5 +1,7 @@
 let editingEntryId = null;
 let deletingEntryId = null;
+let loadedEntries = [];
+let nextCursor = null;
 
 // Load entries when page loads
 document.addEventListener('DOMContentLoaded', () => {
@@ -15,8 +17,11 @@ function setupEventListeners() {
     const cancelDeleteBtn = document.getElementById('cancel-delete-btn');
     const deleteConfirmInput = document.getElementById('delete-confirm-input');
 
+    const loadMoreBtn = document.getElementById('load-more-btn');
+
     form.addEventListener('submit', handleFormSubmit);
     cancelBtn.addEventListener('click', cancelEdit);
+    loadMoreBtn.addEventListener('click', loadMoreEntries);
 
     // Delete modal handlers
     cancelDeleteBtn.addEventListener('click', closeDeleteModal);
@@ -41,12 +46,26 @@ function setupEventListeners() {
 }
 
 async function loadEntries() {
+    // Start again from the newest page
+    loadedEntries = [];
+    nextCursor = null;
+    await fetchEntriesPage('/api/entries');
+}
+
+async function loadMoreEntries() {
+    if (!nextCursor) return;
+    await fetchEntriesPage('/api/entries?' + new URLSearchParams(nextCursor));
+}
+
+async function fetchEntriesPage(url) {
     try {
-        const response = await fetch('/api/entries');
+        const response = await fetch(url);
         const data = await response.json();
 
         if (data.success) {
-            displayEntries(data.entries);
+            loadedEntries = loadedEntries.concat(data.entries);
+            nextCursor = data.next_cursor;
+            displayEntries(loadedEntries);
         } else {
             showError('Failed to load entries: ' + data.error);
         }
@@ -57,6 +76,9 @@ async function loadEntries() {
 
 function displayEntries(entries) {
     const entriesList = document.getElementById('entries-list');
+    const loadMoreBtn = document.getElementById('load-more-btn');
+
+    loadMoreBtn.style.display = nextCursor ? 'inline-block' : 'none';
 
     if (entries.length === 0) {
         entriesList.innerHTML = '<p class="empty-state">No entries yet. Start writing your first journal entry!</p>';
@@ -67,7 +89,7 @@ function displayEntries(entries) {
         <div class="entry-card" data-id="${entry.id}">
             <div class="entry-header">
                 <div class="entry-title">${escapeHtml(entry.title)}</div>
-                <div class="entry-date">${formatDate(entry.created_at)}${entry.updated_at !== entry.created_at ? ' (edited)' : ''}</div>
+                <div class="entry-date">${formatDate(entry.created_at_ms)}${entry.updated_at_ms !== entry.created_at_ms ? ' (edited)' : ''}</div>
             </div>
             <div class="entry-content">${escapeHtml(entry.content)}</div>
             <div class="entry-actions">
@@ -130,27 +152,19 @@ async function handleFormSubmit(e) {
     }
 }
 
-async function editEntry(entryId) {
-    try {
-        const response = await fetch('/api/entries');
-        const data = await response.json();
-
-        if (data.success) {
-            const entry = data.entries.find(e => e.id === entryId);
-            if (entry) {
-                // Populate form with entry data
-                document.getElementById('entry-title').value = entry.title;
-                document.getElementById('entry-content').value = entry.content;
-                editingEntryId = entryId;
-                document.getElementById('form-title').textContent = 'Edit Entry';
-                document.getElementById('cancel-btn').style.display = 'inline-block';
-                
-                // Scroll to form
-                document.querySelector('.entry-form-container').scrollIntoView({ behavior: 'smooth' });
-            }
-        }
-    } catch (error) {
-        alert('Error loading entry: ' + error.message);
+function editEntry(entryId) {
+    // Only loaded entries have an Edit button, so the entry is already here
+    const entry = loadedEntries.find(e => e.id === entryId);
+    if (entry) {
+        // Populate form with entry data
+        document.getElementById('entry-title').value = entry.title;
+        document.getElementById('entry-content').value = entry.content;
+        editingEntryId = entryId;
+        document.getElementById('form-title').textContent = 'Edit Entry';
+        document.getElementById('cancel-btn').style.display = 'inline-block';
+        
+        // Scroll to form
+        document.querySelector('.entry-form-container').scrollIntoView({ behavior: 'smooth' });
     }
 }
 
@@ -201,8 +215,8 @@ async function confirmDelete() {
     }
 }
 
-function formatDate(dateString) {
-    const date = new Date(dateString);
+function formatDate(timestampMs) {
+    const date = new Date(timestampMs);
     return date.toLocaleDateString('en-US', {
         year: 'numeric',
         month: 'long',